@@ -2,10 +2,14 @@
 # A comprehensive analysis of global COVID-19 trends and vaccination progress
 
 import pandas as pd
+import polars as pl
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
+import os
+import gc
+import urllib.request
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
@@ -17,6 +21,8 @@ sns.set_palette('viridis')
 # Display settings for better visualization
 pd.set_option('display.max_columns', None)
 pd.set_option('display.width', 1000)
+pl.Config.set_tbl_cols(-1)
+pl.Config.set_tbl_width_chars(1000)
 
 print("COVID-19 Global Data Tracker")
 print("============================")
@@ -28,48 +34,167 @@ print("---------------------------")
 
 # Download URL for the data
 url = "https://covid.ourworldindata.org/data/owid-covid-data.csv"
-print(f"Downloading data from: {url}")
 
-# Load the data
+# Local Parquet copy of the dataset, reused on subsequent runs
+cache_path = "owid.parquet"
+
+# Sidecar file with the server's ETag (or Last-Modified) for the cached copy
+etag_path = cache_path + ".etag"
+
+# Manually downloaded copy of the CSV, used if the download fails
+local_path = "owid-covid-data.csv"
+
+# Columns used by the analysis below and their types; only these are parsed and cached
+COL_DTYPES = {
+    'iso_code': pl.Categorical,
+    'location': pl.Categorical,
+    'date': pl.Date,
+    'total_cases': pl.Float32,
+    'new_cases': pl.Float32,
+    'total_deaths': pl.Float32,
+    'new_deaths': pl.Float32,
+    'total_vaccinations': pl.Float32,
+    'people_vaccinated': pl.Float32,
+    'people_fully_vaccinated': pl.Float32,
+    'population': pl.Float32,
+}
+USED_COLS = list(COL_DTYPES)
+
+
+def dataset_overview(data):
+    """Row count, date range and number of locations of a lazy dataset, in one query."""
+    return data.select(
+        pl.len().alias('rows'),
+        pl.col('date').min().alias('first_date'),
+        pl.col('date').max().alias('last_date'),
+        pl.col('location').n_unique().alias('locations'),
+    ).collect()
+
+
+def open_cache():
+    """Scan the Parquet cache lazily and collect its overview.
+
+    Opening the scan only reads the file footer, so the overview query runs here
+    too: it decodes the date and location pages, and a damaged cache then fails
+    where the caller can still fall back to another source. Damaged pages in the
+    other columns are only found by the later queries.
+    """
+    cache_lf = pl.scan_parquet(cache_path).select(USED_COLS)
+    return cache_lf, dataset_overview(cache_lf)
+
+
+# Ask the server which version of the dataset it has, without downloading it
+remote_etag = None
 try:
-    df = pd.read_csv(url)
-    print("✅ Data loaded successfully!")
+    head_request = urllib.request.Request(url, method="HEAD")
+    with urllib.request.urlopen(head_request, timeout=10) as response:
+        remote_etag = response.headers.get("ETag") or response.headers.get("Last-Modified")
 except Exception as e:
-    print(f"Error loading data: {e}")
-    print("Falling back to local file if available...")
+    print(f"Could not check for updated data: {e}")
+
+cached_etag = None
+if os.path.exists(etag_path):
+    with open(etag_path) as f:
+        cached_etag = f.read().strip()
+
+# Scan the data from the cache if it is still current (or the server can't be checked).
+# The scan is lazy: the queries below only read the rows and columns they need.
+lf = None
+overview = None
+if os.path.exists(cache_path) and (remote_etag is None or remote_etag == cached_etag):
     try:
-        df = pd.read_csv("owid-covid-data.csv")
-        print("✅ Data loaded from local file!")
-    except:
-        print("❌ Failed to load data. Please download the dataset manually.")
+        lf, overview = open_cache()
+        print(f"✅ Using cached data: {cache_path}")
+    except Exception as e:
+        print(f"Error reading cache: {e}")
+        lf = None
+
+# Otherwise download the data
+if lf is None:
+    df = None
+    print(f"Downloading data from: {url}")
+    downloaded = False
+    try:
+        df = pl.read_csv(url, columns=USED_COLS, schema_overrides=COL_DTYPES)
+        downloaded = True
+        print("✅ Data loaded successfully!")
+    except Exception as e:
+        print(f"Error loading data: {e}")
+        print("Falling back to local copies if available...")
+        # Try the newest local copy first, so an older CSV never replaces a newer cache
+        local_sources = [path for path in (cache_path, local_path) if os.path.exists(path)]
+        local_sources.sort(key=os.path.getmtime, reverse=True)
+        for source in local_sources:
+            try:
+                if source == cache_path:
+                    lf, overview = open_cache()
+                    print(f"✅ Using cached data: {cache_path}")
+                else:
+                    df = pl.read_csv(local_path, columns=USED_COLS, schema_overrides=COL_DTYPES)
+                    print("✅ Data loaded from local file!")
+                break
+            except Exception as e:
+                print(f"Error reading {source}: {e}")
+                lf = None
+        else:
+            print("❌ Failed to load data. Please download the dataset manually.")
+            raise SystemExit(1)
+
+    # Save a compressed columnar copy so the next run skips the download
+    if df is not None:
+        try:
+            df.write_parquet(cache_path, compression="zstd")
+            print(f"✅ Data cached to {cache_path}")
+            # Remember which version was cached so unchanged data isn't downloaded again
+            if downloaded and remote_etag is not None:
+                with open(etag_path, "w") as f:
+                    f.write(remote_etag)
+            elif os.path.exists(etag_path):
+                os.remove(etag_path)
+            # Query the cached copy from disk instead of keeping the full table in memory
+            lf = pl.scan_parquet(cache_path)
+            del df
+            gc.collect()
+        except Exception as e:
+            print(f"Could not cache data: {e}")
+            lf = df.lazy()
 
 # 2. Data Exploration
 print("\n2. Data Exploration")
 print("-----------------")
 
 # Basic info about the dataset
-print(f"Dataset shape: {df.shape}")
-print(f"Time period: {df['date'].min()} to {df['date'].max()}")
-print(f"Number of locations: {df['location'].nunique()}")
+columns = lf.collect_schema().names()
+if overview is None:
+    overview = dataset_overview(lf)
+n_rows = overview['rows'][0]
+print(f"Dataset shape: {(n_rows, len(columns))}")
+print(f"Time period: {overview['first_date'][0]} to {overview['last_date'][0]}")
+print(f"Number of locations: {overview['locations'][0]}")
 
 # Display the first few rows
 print("\nFirst 5 rows of the dataset:")
-print(df.head())
+print(lf.head().collect())
 
 # Check columns
 print("\nColumns in the dataset:")
-print(df.columns.tolist())
+print(columns)
 
 # Summary statistics for key columns
 print("\nSummary statistics for key metrics:")
 key_metrics = ['total_cases', 'new_cases', 'total_deaths', 'new_deaths', 
                'total_vaccinations', 'people_vaccinated', 'people_fully_vaccinated']
-print(df[key_metrics].describe())
+# Skip percentiles so all statistics come from a single pass over the columns
+summary_stats = lf.select(key_metrics).describe(percentiles=None)
+print(summary_stats)
 
-# Check missing values
+# Check missing values, reusing the null counts from the summary
 print("\nMissing values in key columns:")
-missing_values = df[key_metrics].isnull().sum()
-missing_percentage = (df[key_metrics].isnull().sum() / len(df)) * 100
+missing_values = (
+    summary_stats.filter(pl.col('statistic') == 'null_count').drop('statistic')
+    .to_pandas().iloc[0].astype(int)
+)
+missing_percentage = (missing_values / n_rows) * 100
 missing_df = pd.DataFrame({
     'Missing Values': missing_values,
     'Percentage': missing_percentage.round(2)
@@ -80,45 +205,80 @@ print(missing_df)
 print("\n3. Data Cleaning")
 print("--------------")
 
-# Convert date to datetime
-df['date'] = pd.to_datetime(df['date'])
-print("✅ Converted date column to datetime format")
-
 # Select specific countries for detailed analysis
 countries_of_interest = ['World', 'United States', 'India', 'Brazil', 'United Kingdom', 
                          'South Africa', 'Kenya', 'Australia', 'China', 'Germany']
 print(f"Selected countries for detailed analysis: {', '.join(countries_of_interest)}")
 
 # Filter for countries of interest
-filtered_df = df[df['location'].isin(countries_of_interest)]
+filtered_query = lf.filter(pl.col('location').is_in(countries_of_interest))
+
+# Keep the most recent row with case data for each country. Find each country's
+# latest date first (a small streamed aggregation), then semi-join on it, so the
+# full table never has to be sorted or held in memory
+case_rows = lf.filter(pl.col('total_cases').is_not_null())
+latest_dates = case_rows.group_by('location').agg(pl.col('date').max()).collect(engine="streaming")
+latest_query = (
+    case_rows.join(latest_dates.lazy(), on=['location', 'date'], how='semi')
+    .sort('total_cases', descending=True, nulls_last=True)
+)
+
+# Prepare data for the latest date once for both maps
+latest_date = overview['last_date'][0]
+map_query = lf.filter(pl.col('date') == latest_date).select(
+    'iso_code',
+    'location',
+    'total_cases',
+    (pl.col('people_fully_vaccinated') / pl.col('population') * 100).alias('vax_rate')
+)
+
+# Keep the global time series for the summary statistics
+world_query = lf.filter(pl.col('location') == 'World').sort('date')
+
+# Run all queries together in batches; the filters and the join are pushed into the scan
+filtered_df, latest_data, map_df, world_data = pl.collect_all(
+    [filtered_query, latest_query, map_query, world_query], engine="streaming"
+)
+map_df = map_df.to_pandas()
+world_data = world_data.to_pandas()
 print(f"Filtered dataset shape: {filtered_df.shape}")
 
-# Group by country and date to get the latest data
-latest_data = df.groupby('location').last().reset_index()
-latest_data = latest_data.sort_values('total_cases', ascending=False)
-
 # Display top 10 countries by total cases
 print("\nTop 10 countries by total cases (as of latest date):")
-top_10_cases = latest_data[['location', 'total_cases', 'total_deaths']].head(10)
+top_10_cases = latest_data.select(['location', 'total_cases', 'total_deaths']).head(10)
 print(top_10_cases)
 
-# Calculate case fatality rate
-filtered_df['case_fatality_rate'] = (filtered_df['total_deaths'] / filtered_df['total_cases']) * 100
+# Calculate case fatality rate and vaccination rate in a single pass
+filtered_df = filtered_df.with_columns(
+    (pl.col('total_deaths') / pl.col('total_cases') * 100).alias('case_fatality_rate'),
+    (pl.col('people_fully_vaccinated') / pl.col('population') * 100).alias('vaccination_rate')
+)
 print("\n✅ Calculated case fatality rate")
-
-# Calculate vaccination rate
-filtered_df['vaccination_rate'] = (filtered_df['people_fully_vaccinated'] / filtered_df['population']) * 100
 print("✅ Calculated vaccination rate")
 
+# Calculate 7-day moving average of new cases to smooth the curve
+filtered_df = filtered_df.sort(['location', 'date']).with_columns(
+    pl.col('new_cases').rolling_mean(window_size=7).over('location').alias('new_cases_smooth')
+)
+print("✅ Calculated 7-day moving average of new cases")
+
 # 4. Exploratory Data Analysis (EDA)
 print("\n4. Exploratory Data Analysis")
 print("--------------------------")
 
+# Convert to pandas for plotting, with string labels so seaborn keeps the row order
+filtered_df = filtered_df.with_columns(pl.col(pl.Categorical).cast(pl.String)).to_pandas()
+latest_data = latest_data.with_columns(pl.col(pl.Categorical).cast(pl.String)).to_pandas()
+
+# Reshape to one column per country so each metric is plotted in a single call
+plot_metrics = ['total_cases', 'total_deaths', 'case_fatality_rate', 'new_cases_smooth',
+                'people_vaccinated', 'vaccination_rate']
+wide = filtered_df.pivot(index='date', columns='location', values=plot_metrics)
+wide = wide.reindex(columns=pd.MultiIndex.from_product([plot_metrics, countries_of_interest]))
+
 # Plot total cases over time for selected countries
 plt.figure(figsize=(14, 8))
-for country in countries_of_interest:
-    country_data = filtered_df[filtered_df['location'] == country]
-    plt.plot(country_data['date'], country_data['total_cases'], label=country)
+wide['total_cases'].plot(ax=plt.gca())
 
 plt.title('Total COVID-19 Cases Over Time', fontsize=16)
 plt.xlabel('Date', fontsize=12)
@@ -131,9 +291,7 @@ plt.show()
 
 # Plot total deaths over time for selected countries
 plt.figure(figsize=(14, 8))
-for country in countries_of_interest:
-    country_data = filtered_df[filtered_df['location'] == country]
-    plt.plot(country_data['date'], country_data['total_deaths'], label=country)
+wide['total_deaths'].plot(ax=plt.gca())
 
 plt.title('Total COVID-19 Deaths Over Time', fontsize=16)
 plt.xlabel('Date', fontsize=12)
@@ -146,9 +304,7 @@ plt.show()
 
 # Plot case fatality rate
 plt.figure(figsize=(14, 8))
-for country in countries_of_interest:
-    country_data = filtered_df[filtered_df['location'] == country]
-    plt.plot(country_data['date'], country_data['case_fatality_rate'], label=country)
+wide['case_fatality_rate'].plot(ax=plt.gca())
 
 plt.title('COVID-19 Case Fatality Rate Over Time', fontsize=16)
 plt.xlabel('Date', fontsize=12)
@@ -161,11 +317,7 @@ plt.show()
 
 # Compare daily new cases
 plt.figure(figsize=(14, 8))
-for country in countries_of_interest:
-    country_data = filtered_df[filtered_df['location'] == country]
-    # Calculate 7-day moving average to smooth the curve
-    country_data['new_cases_smooth'] = country_data['new_cases'].rolling(window=7).mean()
-    plt.plot(country_data['date'], country_data['new_cases_smooth'], label=country)
+wide['new_cases_smooth'].plot(ax=plt.gca())
 
 plt.title('Daily New COVID-19 Cases (7-day Moving Average)', fontsize=16)
 plt.xlabel('Date', fontsize=12)
@@ -192,9 +344,7 @@ print("-----------------------------")
 
 # Plot cumulative vaccinations over time
 plt.figure(figsize=(14, 8))
-for country in countries_of_interest:
-    country_data = filtered_df[filtered_df['location'] == country]
-    plt.plot(country_data['date'], country_data['people_vaccinated'], label=country)
+wide['people_vaccinated'].plot(ax=plt.gca())
 
 plt.title('Cumulative COVID-19 Vaccinations Over Time', fontsize=16)
 plt.xlabel('Date', fontsize=12)
@@ -207,9 +357,7 @@ plt.show()
 
 # Plot vaccination rate over time
 plt.figure(figsize=(14, 8))
-for country in countries_of_interest:
-    country_data = filtered_df[filtered_df['location'] == country]
-    plt.plot(country_data['date'], country_data['vaccination_rate'], label=country)
+wide['vaccination_rate'].plot(ax=plt.gca())
 
 plt.title('COVID-19 Vaccination Rate Over Time', fontsize=16)
 plt.xlabel('Date', fontsize=12)
@@ -236,7 +384,10 @@ plt.show()
 print("\nCorrelation between key metrics:")
 correlation_metrics = ['total_cases', 'total_deaths', 'total_vaccinations', 
                       'people_vaccinated', 'people_fully_vaccinated', 'population']
-correlation = filtered_df[correlation_metrics].corr()
+# Use rows where every metric is reported and compute the matrix in one NumPy call
+correlation_values = filtered_df[correlation_metrics].dropna().to_numpy()
+correlation = pd.DataFrame(np.corrcoef(correlation_values, rowvar=False),
+                           index=correlation_metrics, columns=correlation_metrics)
 print(correlation)
 
 # Plot correlation heatmap
@@ -250,14 +401,10 @@ plt.show()
 print("\n6. Choropleth Map Visualization")
 print("----------------------------")
 
-# Prepare data for the latest date
-latest_date = df['date'].max()
-latest_map_data = df[df['date'] == latest_date]
-
 # Create a choropleth map of total cases
 try:
     fig = px.choropleth(
-        latest_map_data,
+        map_df,
         locations="iso_code",
         color="total_cases",
         hover_name="location",
@@ -271,11 +418,8 @@ except Exception as e:
 
 # Create a choropleth map of vaccination rates
 try:
-    # Calculate vaccination rate for the map
-    latest_map_data['vax_rate'] = (latest_map_data['people_fully_vaccinated'] / latest_map_data['population']) * 100
-    
     fig = px.choropleth(
-        latest_map_data,
+        map_df,
         locations="iso_code",
         color="vax_rate",
         hover_name="location",
@@ -292,7 +436,6 @@ print("\n7. Key Insights & Findings")
 print("------------------------")
 
 # Calculate global statistics
-world_data = df[df['location'] == 'World'].sort_values('date')
 latest_world = world_data.iloc[-1]
 
 print(f"Global COVID-19 Statistics (as of {latest_world['date'].strftime('%Y-%m-%d')}):")
@@ -308,17 +451,17 @@ else:
     print("- Vaccination data not available for the latest date")
 
 # Find country with highest case fatality rate
-highest_cfr = latest_data.sort_values('case_fatality_rate', ascending=False).iloc[0]
+highest_cfr = latest_data.loc[latest_data['case_fatality_rate'].idxmax()]
 print(f"\nCountry with highest case fatality rate: {highest_cfr['location']} ({highest_cfr['case_fatality_rate']:.2f}%)")
 
 # Find country with highest vaccination rate
-highest_vax = latest_data.sort_values('vaccination_rate', ascending=False).iloc[0]
+highest_vax = latest_data.loc[latest_data['vaccination_rate'].idxmax()]
 print(f"Country with highest vaccination rate: {highest_vax['location']} ({highest_vax['vaccination_rate']:.2f}%)")
 
 # Calculate case growth rates
-latest_world_data = world_data.iloc[-30:].copy()  # Last 30 days
-latest_world_data['growth_rate'] = latest_world_data['new_cases'].pct_change()
-avg_growth_rate = latest_world_data['growth_rate'].mean() * 100
+recent_cases = world_data['new_cases'].to_numpy()[-30:]  # Last 30 days
+growth_rate = (recent_cases[1:] - recent_cases[:-1]) / recent_cases[:-1]
+avg_growth_rate = np.nanmean(growth_rate) * 100
 print(f"Average global case growth rate (last 30 days): {avg_growth_rate:.2f}%")
 
 # Final summary